@@ -2,4 +2,4 @@
 
 . env/bin/activate
 
-python manage.py celery worker --loglevel=info
+python manage.py celery worker -O fair --loglevel=info
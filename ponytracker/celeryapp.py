@@ -3,6 +3,7 @@ import os
 from celery import Celery
 
 from django.conf import settings
+from django.db import connections
 
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ponytracker.settings')
@@ -13,6 +14,15 @@ app.config_from_object('django.conf:settings')
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
 
-@app.task(bind=True)
+@app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print('Request: {0!r}'.format(self.request))
+
+
+@app.task(ignore_result=True)
+def optimize_db():
+    # Let SQLite refresh the planner statistics which are out of date
+    for connection in connections.all():
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA optimize')
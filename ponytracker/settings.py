@@ -13,6 +13,7 @@ https://ponytracker.readthedocs.org/
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 import os
+from datetime import timedelta
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 
@@ -109,6 +110,19 @@ DATABASES = {
     }
 }
 
+# PRAGMAs run on each new SQLite connection (see tracker.signals).
+# WAL lets readers run concurrently with a writer, which matters as soon as
+# celery workers write to the database; page_size must be set before WAL is
+# enabled as it can not be changed afterwards.
+SQLITE_PRAGMAS = [
+    'page_size = 4096',
+    'journal_mode = WAL',
+    'synchronous = NORMAL',
+    'cache_size = -20000',
+    'mmap_size = 268435456',
+    'temp_store = MEMORY',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/dev/topics/i18n/
 
@@ -172,10 +186,45 @@ BOOTSTRAP3 = {
 
 # Celery configuration
 BROKER_URL = 'redis://localhost:6379/0'
-CELERY_RESULT_BACKEND = 'djcelery.backends.database:DatabaseBackend'
+CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# Mail sending tasks are slow: reserve one task at a time so that an idle
+# worker is not left waiting while another one holds several tasks.
+CELERYD_PREFETCH_MULTIPLIER = 1
+# Notifications do not need to survive a broker restart: publish them
+# to a non durable queue to spare the broker a disk write per message.
+try:
+    from kombu import Exchange, Queue
+except ImportError:  # celery is optional
+    pass
+else:
+    CELERY_QUEUES = (
+        Queue('celery', routing_key='celery'),
+        Queue('transient', Exchange('transient', delivery_mode=1),
+              routing_key='transient', durable=False),
+    )
+CELERY_ROUTES = {
+    'tracker.tasks.send_mails': {
+        'queue': 'transient',
+        'delivery_mode': 'transient',
+    },
+    'tracker.tasks.refresh_unread': {
+        'queue': 'transient',
+        'delivery_mode': 'transient',
+    },
+}
+CELERYBEAT_SCHEDULE = {
+    'optimize-db': {
+        'task': 'ponytracker.celeryapp.optimize_db',
+        'schedule': timedelta(hours=1),
+    },
+    'refresh-unread': {
+        'task': 'tracker.tasks.refresh_unread',
+        'schedule': timedelta(hours=1),
+    },
+}
 
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -2,6 +2,8 @@ from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
+from django.contrib.sites.shortcuts import get_current_site
+from django.utils.functional import SimpleLazyObject
 
 from tracker.utils import granted_projects
 
@@ -32,6 +34,10 @@ class ProjectMiddleware(object):
                 " 'django.contrib.auth.middleware.AuthenticationMiddleware'"
                 " before the ProjectMiddleware class.")
 
+        # site settings, loaded at most once per request
+        request.site_settings = SimpleLazyObject(
+                lambda: get_current_site(request).settings)
+
         all_projects = granted_projects(request.user)
 
         # filtering archived / not archived projects
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-15 00:31
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_event_issue_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['issue', 'code', 'date'], name='tracker_eve_issue_i_704a5c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'closed'], name='tracker_iss_project_16c5da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['milestone', 'closed'], name='tracker_iss_milesto_66a447_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='readstate',
+            index=models.Index(fields=['user', 'issue'], name='tracker_rea_user_id_3faa1f_idx'),
+        ),
+    ]
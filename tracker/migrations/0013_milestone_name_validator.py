@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+import re
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='milestone',
+            name='name',
+            field=models.CharField(max_length=32, validators=[django.core.validators.RegexValidator(message='Please enter only lowercase characters, number, dot, underscores or hyphens.', regex=re.compile('^[a-z0-9_.-]+\\Z'))]),
+        ),
+    ]
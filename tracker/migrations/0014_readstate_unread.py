@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-15 00:47
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def compute_unread(apps, schema_editor):
+    ReadState = apps.get_model('tracker', 'ReadState')
+    Event = apps.get_model('tracker', 'Event')
+    events = Event.objects.filter(issue=OuterRef('issue'),
+                                  date__gt=OuterRef('lastread')) \
+            .order_by().values('issue').annotate(nb=Count('pk')) \
+            .values('nb')
+    ReadState.objects.update(unread=Coalesce(
+        Subquery(events, output_field=models.IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_milestone_name_validator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readstate',
+            name='unread',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(compute_unread, migrations.RunPython.noop),
+    ]
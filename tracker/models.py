@@ -1,11 +1,17 @@
 from __future__ import unicode_literals
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, Exists, Max, OuterRef, Subquery, \
+        Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.query import ModelIterable
+from django.conf import settings
 from django.core.validators import RegexValidator
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.html import escape, format_html
 from django.utils.encoding import python_2_unicode_compatible
+from django.utils.functional import cached_property
 from django.contrib.sites.models import Site
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
@@ -15,6 +21,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from colorful.fields import RGBColorField
 
 import json
+import re
 from datetime import datetime, timedelta
 
 from accounts.models import User
@@ -23,6 +30,10 @@ from accounts.models import User
 __all__ = ['Project', 'Issue', 'Label', 'Milestone', 'ReadState', 'Event']
 
 
+# \Z rather than $ which would accept a trailing newline
+MILESTONE_NAME_RE = re.compile(r'^[a-z0-9_.-]+\Z')
+
+
 class Settings(models.Model):
 
     EDIT_NOTIMEOUT = 0
@@ -54,6 +65,23 @@ class Settings(models.Model):
 
 
 
+class ProjectQuerySet(models.QuerySet):
+
+    def with_unread_issues_nb(self, user):
+        """
+        Annotate each project with the number of issues having unread
+        messages for the given user (``unread_issues_nb``).
+        """
+        if not user.is_authenticated:
+            return self.annotate(unread_issues_nb=Value(0,
+                output_field=models.IntegerField()))
+        unread = Issue.objects.filter(project=OuterRef('pk')) \
+                .unread_by(user).order_by().values('project') \
+                .annotate(nb=Count('pk')).values('nb')
+        return self.annotate(unread_issues_nb=Coalesce(
+            Subquery(unread, output_field=models.IntegerField()), 0))
+
+
 @python_2_unicode_compatible
 class Project(models.Model):
 
@@ -85,6 +113,8 @@ class Project(models.Model):
 
     archived = models.BooleanField(default=False)
 
+    objects = ProjectQuerySet.as_manager()
+
     @property
     def labels(self):
         return Label.objects.filter(project=self, deleted=False)
@@ -96,12 +126,7 @@ class Project(models.Model):
     def get_unread_issues_nb(self, user):
         if not user.is_authenticated:
             return 0
-        count = 0
-        for issue in self.issues.all():
-            if issue.have_unread_message(user):
-                count +=1
-        return count
-
+        return self.issues.unread_by(user).count()
 
     def __str__(self):
         return self.display_name
@@ -122,7 +147,7 @@ class Label(models.Model):
     inverted = models.BooleanField(default=True,
             verbose_name="Inverse text color")
 
-    @property
+    @cached_property
     def url(self):
 
         url = reverse('list-issue', kwargs={'project': self.project.name})
@@ -130,7 +155,7 @@ class Label(models.Model):
 
         return mark_safe(url)
 
-    @property
+    @cached_property
     def style(self):
 
         if self.inverted:
@@ -154,6 +179,20 @@ class Label(models.Model):
         return self.name
 
 
+class MilestoneQuerySet(models.QuerySet):
+
+    def with_progress(self):
+        """
+        Annotate the milestones with their number of issues and closed
+        issues, used by Milestone.progress().
+        """
+        return self.annotate(
+            total_issues_nb=Count('issues'),
+            closed_issues_nb=Sum(Case(When(issues__closed=True, then=1),
+                                      default=0,
+                                      output_field=models.IntegerField())))
+
+
 @python_2_unicode_compatible
 class Milestone(models.Model):
 
@@ -161,7 +200,7 @@ class Milestone(models.Model):
         ordering = ['due_date']
         unique_together = ['project', 'name']
 
-    name_validator = RegexValidator(regex='^[a-z0-9_.-]+$',
+    name_validator = RegexValidator(regex=MILESTONE_NAME_RE,
             message="Please enter only lowercase characters, number, "
                     "dot, underscores or hyphens.")
 
@@ -175,6 +214,8 @@ class Milestone(models.Model):
 
     deleted = models.BooleanField(default=False)
 
+    objects = MilestoneQuerySet.as_manager()
+
     def closed_issues(self):
 
         return self.issues.filter(closed=True).count()
@@ -185,15 +226,22 @@ class Milestone(models.Model):
 
     def progress(self):
 
-        closed = self.closed_issues()
-        total = self.total_issues()
+        if hasattr(self, 'total_issues_nb'):
+            total = self.total_issues_nb
+            closed = self.closed_issues_nb
+        else:
+            counts = self.issues.aggregate(total=Count('pk'),
+                    closed=Sum(Case(When(closed=True, then=1), default=0,
+                                    output_field=models.IntegerField())))
+            total = counts['total']
+            closed = counts['closed']
 
         if total:
             return int(100 * closed / total)
         else:
             return 0
 
-    @property
+    @cached_property
     def url(self):
 
         url = reverse('list-issue', kwargs={'project': self.project.name})
@@ -205,6 +253,39 @@ class Milestone(models.Model):
         return self.name
 
 
+class IssueQuerySet(models.QuerySet):
+
+    def with_display(self):
+        return self.select_related('project', 'author', 'milestone',
+                                   'assignee') \
+                .prefetch_related('labels', 'subscribers')
+
+    def unread_by(self, user):
+        """
+        Issues never read by the user or having events more recent
+        than the last time they read them.
+        """
+        read = ReadState.objects.filter(issue=OuterRef('pk'), user=user,
+                                        unread=0)
+        return self.annotate(is_read=Exists(read)).filter(is_read=False)
+
+    def with_unread_event_nb(self, user):
+        """
+        Annotate each issue with the number of events not read by the user
+        (``unread_event_nb``), all of them if they never read the issue.
+        """
+        if not user.is_authenticated:
+            return self.annotate(unread_event_nb=Value(0,
+                output_field=models.IntegerField()))
+        unread = ReadState.objects.filter(issue=OuterRef('pk'), user=user) \
+                .values('unread')[:1]
+        events = Event.objects.filter(issue=OuterRef('pk')).order_by() \
+                .values('issue').annotate(nb=Count('pk')).values('nb')
+        return self.annotate(unread_event_nb=Coalesce(
+            Subquery(unread, output_field=models.IntegerField()),
+            Subquery(events, output_field=models.IntegerField()), 0))
+
+
 @python_2_unicode_compatible
 class Issue(models.Model):
 
@@ -216,6 +297,10 @@ class Issue(models.Model):
 
     class Meta:
         unique_together = ['project', 'id']
+        indexes = [
+            models.Index(fields=['project', 'closed']),
+            models.Index(fields=['milestone', 'closed']),
+        ]
 
     title = models.CharField(max_length=128)
 
@@ -239,14 +324,13 @@ class Issue(models.Model):
     subscribers = models.ManyToManyField(User, blank=True,
             related_name='subscribed_issues')
 
+    objects = IssueQuerySet.as_manager()
+
     @staticmethod
     def next_id(project):
 
-        last_issue = project.issues.last()
-        if last_issue:
-            return last_issue.id + 1
-        else:
-            return 1
+        last_id = project.issues.aggregate(last_id=Max('id'))['last_id']
+        return (last_id or 0) + 1
 
     @property
     def comments(self):
@@ -262,22 +346,18 @@ class Issue(models.Model):
             return False
 
     def getdescevent(self):
-        desc = self.events.filter(code=Event.DESCRIBE)
-        if desc.exists():
-            return desc.first()
-        else:
-            return None
+        return self.events.filter(code=Event.DESCRIBE).first()
 
     def getdesc(self):
         desc = self.getdescevent()
-        if desc:
-            return desc.additionnal_section
-        else:
+        if desc is None:
             return None
+        else:
+            return desc.additionnal_section
 
     def setdesc(self, value):
         desc = self.getdescevent()
-        if desc:
+        if desc is not None:
             desc.additionnal_section = value
             desc.save()
         else:
@@ -287,25 +367,35 @@ class Issue(models.Model):
 
     def deldesc(self):
         desc = self.getdescevent()
-        if desc:
+        if desc is not None:
             desc.delete()
+            refresh_unread_counters(self.pk)
 
     description = property(getdesc, setdesc, deldesc)
 
-    def add_label(self, author, label, commit=True):
+    def add_label(self, author, label):
         if self.labels.filter(pk=label.pk).exists():
             return
         self.labels.add(label)
-        if commit:
-            self.save()
         event = Event(issue=self, author=author,
                 code=Event.ADD_LABEL, args={'label': label.id})
         event.save()
 
-    def remove_label(self, author, label, commit=True):
+    def add_labels(self, author, labels):
+        present = set(self.labels.filter(pk__in=[label.pk for label in labels])
+                          .values_list('pk', flat=True))
+        labels = [label for label in labels if label.pk not in present]
+        if not labels:
+            return
+        self.labels.add(*labels)
+        Event.objects.bulk_create([Event(issue=self, author=author,
+                code=Event.ADD_LABEL, args={'label': label.id})
+            for label in labels])
+        # bulk_create() does not send post_save
+        refresh_unread_counters(self.pk)
+
+    def remove_label(self, author, label):
         self.labels.remove(label)
-        if commit:
-            self.save()
         event = Event(issue=self, author=author,
                 code=Event.DEL_LABEL, args={'label': label.id})
         event.save()
@@ -340,11 +430,7 @@ class Issue(models.Model):
     def have_unread_message(self, user):
         if not user.is_authenticated:
             return False
-        try:
-            readstate = self.readstates.get(user=user)
-        except ObjectDoesNotExist:
-            return True
-        return self.events.filter(date__gt=readstate.lastread).exists()
+        return Issue.objects.filter(pk=self.pk).unread_by(user).exists()
 
     def get_unread_event_nb(self, user):
         if not user.is_authenticated:
@@ -353,7 +439,7 @@ class Issue(models.Model):
             readstate = self.readstates.get(user=user)
         except ObjectDoesNotExist:
             return self.events.count()
-        return self.events.filter(date__gt=readstate.lastread).count()
+        return readstate.unread
 
     def mark_as_read(self, user):
         if not user.is_authenticated:
@@ -365,12 +451,28 @@ class Issue(models.Model):
             readstate = ReadState(issue=self, user=user)
             olddate = self.opened_at
         readstate.lastread = timezone.now()
+        readstate.unread = 0
         readstate.save()
         return olddate
 
     def __str__(self):
         return self.title
 
+
+class ReadStateQuerySet(models.QuerySet):
+
+    def refresh_unread(self):
+        """
+        Recompute the unread events counters from the events dates.
+        """
+        events = Event.objects \
+            .filter(issue=OuterRef('issue'), date__gt=OuterRef('lastread')) \
+            .order_by().values('issue').annotate(nb=Count('pk')) \
+            .values('nb')
+        return self.update(unread=Coalesce(
+            Subquery(events, output_field=models.IntegerField()), 0))
+
+
 @python_2_unicode_compatible
 class ReadState(models.Model):
 
@@ -380,13 +482,69 @@ class ReadState(models.Model):
 
     lastread = models.DateTimeField(auto_now_add=True)
 
+    # number of events since lastread, see refresh_unread_counters()
+    unread = models.IntegerField(default=0)
+
+    objects = ReadStateQuerySet.as_manager()
+
     class Meta:
         unique_together = ('issue', 'user')
+        indexes = [
+            models.Index(fields=['user', 'issue']),
+        ]
 
     def __str__(self):
         return "%s : User=%s lastread=%s" % (self.issue, self.user, self.lastread)
 
 
+def refresh_unread_counters(issue_pk):
+    """
+    Refresh the unread counters of an issue, through celery if available.
+    """
+    if 'djcelery' in settings.INSTALLED_APPS:
+        # tracker.tasks imports this module
+        from tracker.tasks import refresh_unread
+        transaction.on_commit(lambda: refresh_unread.delay(issue_pk))
+    else:
+        ReadState.objects.filter(issue__pk=issue_pk).refresh_unread()
+
+
+class TimelineIterable(ModelIterable):
+
+    """
+    Share a single instance of each project between the events, with the
+    labels referenced by the events loaded once for all.
+    """
+
+    def __iter__(self):
+        events = list(super(TimelineIterable, self).__iter__())
+        projects = {}
+        for event in events:
+            project = projects.setdefault(event.issue.project_id,
+                                          event.issue.project)
+            event.issue.project = project
+        for project in projects.values():
+            Event.prepare_labels([event for event in events
+                                  if event.issue.project is project], project)
+        return iter(events)
+
+
+class EventQuerySet(models.QuerySet):
+
+    def with_display(self):
+        return self.select_related('issue__project', 'author')
+
+    def with_later_comment(self):
+        later_comments = Event.objects.filter(issue=OuterRef('issue'),
+                code=Event.COMMENT, date__gt=OuterRef('date'))
+        return self.annotate(has_later_comment=Exists(later_comments))
+
+    def for_timeline(self):
+        qs = self.with_display()
+        qs._iterable_class = TimelineIterable
+        return qs
+
+
 @python_2_unicode_compatible
 class Event(models.Model):
 
@@ -416,13 +574,27 @@ class Event(models.Model):
 
     code = models.IntegerField(default=UNKNOW)
 
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['issue', 'date']),
+            models.Index(fields=['issue', 'code', 'date']),
+        ]
+
     _args = models.CharField(max_length=1024, blank=True, default="{}")
 
     def getargs(self):
-        return json.loads(self._args)
+        # parse once, as long as the raw value does not change
+        cache = getattr(self, '_args_cache', None)
+        if cache is None or cache[0] is not self._args:
+            cache = (self._args, json.loads(self._args))
+            self._args_cache = cache
+        return cache[1]
 
     def setargs(self, args):
         self._args = json.dumps(args)
+        self._args_cache = (self._args, dict(args))
 
     def delargs(self):
         self._args = "{}"
@@ -430,6 +602,48 @@ class Event(models.Model):
 
     additionnal_section = models.TextField(blank=True, default="")
 
+    GLYPHICONS = {
+        COMMENT: "comment",
+        DESCRIBE: "edit",
+        CLOSE: "ban-circle",
+        REOPEN: "refresh",
+        RENAME: "transfer",
+        ADD_LABEL: "tag",
+        DEL_LABEL: "tag",
+        SET_MILESTONE: "road",
+        CHANGE_MILESTONE: "road",
+        UNSET_MILESTONE: "road",
+        REFERENCE: "transfer",
+        ASSIGN: "user",
+        UNASSIGN: "user",
+        SET_DUE_DATE: "calendar",
+        CHANGE_DUE_DATE: "calendar",
+        UNSET_DUE_DATE: "calendar",
+    }
+
+    @classmethod
+    def prepare_labels(cls, events, project):
+        """
+        Load in a single query the labels referenced by the events of the
+        given project, for get_label() to use.
+        """
+        codes = (cls.ADD_LABEL, cls.DEL_LABEL)
+        ids = set(event.args['label'] for event in events
+                  if event.code in codes)
+        labels = {}
+        if ids:
+            for label in Label.objects.filter(project=project, id__in=ids):
+                label.project = project
+                labels[label.id] = label
+        for event in events:
+            event._label_cache = labels
+
+    def get_label(self, id):
+        labels = getattr(self, '_label_cache', {})
+        if id in labels:
+            return labels[id]
+        return Label.objects.get(id=id)
+
     def editable(self):
 
         return self.code == Event.COMMENT or self.code == Event.DESCRIBE
@@ -447,173 +661,122 @@ class Event(models.Model):
                 not self.author == request.user:
             return False
 
-        policy = get_current_site(request).settings.edit_policy
+        site_settings = getattr(request, 'site_settings', None)
+        if site_settings is None:
+            site_settings = get_current_site(request).settings
+            request.site_settings = site_settings
+        policy = site_settings.edit_policy
         if policy == Settings.EDIT_TIMEOUT:
-            return self.date + timedelta(minutes=get_current_site(request).settings.edit_policy_timeout) > timezone.now()
+            return self.date + timedelta(minutes=site_settings.edit_policy_timeout) > timezone.now()
         elif policy == Settings.EDIT_NOMORECOMMENT:
+            # annotated by EventQuerySet.with_later_comment()
+            if hasattr(self, 'has_later_comment'):
+                return not self.has_later_comment
             return not self.issue.events.filter(code=Event.COMMENT, date__gt=self.date).exists()
         return True
 
     def glyphicon(self):
 
-        if self.code == Event.COMMENT:
-            return "comment"
-        elif self.code == Event.DESCRIBE:
-            return "edit"
-        elif self.code == Event.CLOSE:
-            return "ban-circle"
-        elif self.code == Event.REOPEN:
-            return "refresh"
-        elif self.code == Event.RENAME:
-            return "transfer"
-        elif self.code == Event.ADD_LABEL \
-                or self.code == Event.DEL_LABEL:
-            return "tag"
-        elif self.code == Event.SET_MILESTONE \
-                or self.code == Event.CHANGE_MILESTONE \
-                or self.code == Event.UNSET_MILESTONE:
-            return "road"
-        elif self.code == Event.REFERENCE:
-            return "transfer"
-        elif self.code == Event.ASSIGN \
-                or self.code == Event.UNASSIGN:
-            return "user"
-        elif self.code == Event.SET_DUE_DATE \
-                or self.code == Event.CHANGE_DUE_DATE \
-                or self.code == Event.UNSET_DUE_DATE:
-            return "calendar"
-        else:
-            return "cog"
+        return Event.GLYPHICONS.get(self.code, "cog")
 
     def activity(self):
 
-        args = {k: escape(v) for k, v in self.args.items()}
-
-        if self.code == Event.DESCRIBE:
-            description = "created issue"
-        elif self.code == Event.COMMENT:
-            description = "commented on issue"
-        elif self.code == Event.CLOSE:
-            description = "closed issue"
-        elif self.code == Event.REOPEN:
-            description = "reopened issue"
-        elif self.code == Event.RENAME:
-            description = "changed the title of issue"
-        elif self.code == Event.ADD_LABEL or self.code == Event.DEL_LABEL:
-            label = Label.objects.get(id=args['label'])
-            if self.code == Event.ADD_LABEL:
-                action = 'added'
-            else:
-                action = 'removed'
-            description = '%s the <a href="%s" class="label" ' \
-                          'style="%s">%s</a> label to issue' \
-                          % (action, label.url, label.style, label)
-        elif self.code == Event.SET_MILESTONE \
-                or self.code == Event.UNSET_MILESTONE:
-            milestone = Milestone(name=args['milestone'],
-                    project=self.issue.project)
-            if self.code == Event.SET_MILESTONE:
-                action = 'added to'
-            else:
-                action = 'removed from'
-            description = '%s the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone the issue' \
-                          % (action, milestone.url, milestone)
-        elif self.code == Event.CHANGE_MILESTONE:
-            old_ms = Milestone(name=args['old_milestone'],
-                    project=self.issue.project)
-            new_ms = Milestone(name=args['new_milestone'],
-                    project=self.issue.project)
-            description = 'moved from the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone ' \
-                          'to the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone the issue' \
-                          % (old_ms.url, old_ms, new_ms.url, new_ms)
-        elif self.code == Event.REFERENCE:
-            description = "referenced the issue"
-        elif self.code == Event.SET_DUE_DATE:
-            due_date = datetime.fromtimestamp(float(args['due_date']))
-            description = 'set the due date to <em>%s</em> of issue' \
-                          % due_date
-        elif self.code == Event.CHANGE_DUE_DATE:
-            old_due_date = datetime.fromtimestamp(float(args['old_due_date']))
-            new_due_date = datetime.fromtimestamp(float(args['new_due_date']))
-            description = 'changed the due date from <em>%s</em> to ' \
-                          '<em>%s</em> of issue' \
-                          % (old_due_date, new_due_date)
-        elif self.code == Event.UNSET_DUE_DATE:
-            description = 'removed the due date of issue'
-        else:
+        formatter = _ACTIVITIES.get(self.code)
+        if formatter is None:
             return None
-
-        return description
+        # arguments are escaped by format_html() when used
+        return formatter(self, self.args)
 
     def __str__(self):
 
-        args = {k: escape(v) for k, v in self.args.items()}
-
-        if self.code == Event.COMMENT or self.code == Event.DESCRIBE:
-            description = "commented"
-        elif self.code == Event.CLOSE:
-            description = "closed this issue"
-        elif self.code == Event.REOPEN:
-            description = "reopened this issue"
-        elif self.code == Event.RENAME:
-            description = "changed the title from <mark>%s</mark> " \
-                          "to <mark>%s</mark>" \
-                          % (args['old_title'], args['new_title'])
-        elif self.code == Event.ADD_LABEL or self.code == Event.DEL_LABEL:
-            label = Label.objects.get(id=args['label'])
-            if self.code == Event.ADD_LABEL:
-                action = 'added'
-            else:
-                action = 'removed'
-            description = '%s the <a href="%s" class="label" ' \
-                          'style="%s">%s</a> label' \
-                          % (action, label.url, label.style, label)
-        elif self.code == Event.SET_MILESTONE \
-                or self.code == Event.UNSET_MILESTONE:
-            milestone = Milestone(name=args['milestone'],
-                    project=self.issue.project)
-            if self.code == Event.SET_MILESTONE:
-                action = 'added'
-            else:
-                action = 'removed'
-            description = '%s this to the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone' \
-                          % (action, milestone.url, milestone)
-        elif self.code == Event.CHANGE_MILESTONE:
-            old_ms = Milestone(name=args['old_milestone'],
-                    project=self.issue.project)
-            new_ms = Milestone(name=args['new_milestone'],
-                    project=self.issue.project)
-            description = 'moved this from the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone ' \
-                          'to the <span class="glyphicon ' \
-                          'glyphicon-road"></span> <a href="%s">' \
-                          '<b>%s</b></a> milestone' \
-                          % (old_ms.url, old_ms, new_ms.url, new_ms)
-        elif self.code == Event.REFERENCE:
-            description = "referenced this issue"
-        elif self.code == Event.REFERENCE:
-            description = "referenced the issue"
-        elif self.code == Event.SET_DUE_DATE:
-            due_date = datetime.fromtimestamp(float(args['due_date']))
-            description = 'set the due date to <em>%s</em>' \
-                          % due_date
-        elif self.code == Event.CHANGE_DUE_DATE:
-            old_due_date = datetime.fromtimestamp(float(args['old_due_date']))
-            new_due_date = datetime.fromtimestamp(float(args['new_due_date']))
-            description = 'changed the due date from <em>%s</em> to <em>%s</em>' \
-                          % (old_due_date, new_due_date)
-        elif self.code == Event.UNSET_DUE_DATE:
-            description = 'removed the due date'
-        else:
+        formatter = _DESCRIPTIONS.get(self.code)
+        if formatter is None:
             return None
-
-        return description
+        # arguments are escaped by format_html() when used
+        return formatter(self, self.args)
+
+
+def _label_link(event):
+    label = event.get_label(event.args['label'])
+    return format_html('<a href="{}" class="label" style="{}">{}</a>',
+                       label.url, label.style, label.name)
+
+
+def _milestone_link(event, name):
+    # the name ends up in the (safe) url too, so escape it right away
+    milestone = Milestone(name=escape(name), project=event.issue.project)
+    return format_html('<span class="glyphicon glyphicon-road"></span> '
+                       '<a href="{}"><b>{}</b></a>', milestone.url,
+                       milestone.name)
+
+
+def _due_date(args, key):
+    return datetime.fromtimestamp(float(args[key]))
+
+
+# Event code -> formatter of the event in the project activity
+_ACTIVITIES = {
+    Event.DESCRIBE: lambda event, args: "created issue",
+    Event.COMMENT: lambda event, args: "commented on issue",
+    Event.CLOSE: lambda event, args: "closed issue",
+    Event.REOPEN: lambda event, args: "reopened issue",
+    Event.RENAME: lambda event, args: "changed the title of issue",
+    Event.ADD_LABEL: lambda event, args:
+        format_html('added the {} label to issue', _label_link(event)),
+    Event.DEL_LABEL: lambda event, args:
+        format_html('removed the {} label to issue', _label_link(event)),
+    Event.SET_MILESTONE: lambda event, args:
+        format_html('added to the {} milestone the issue',
+                    _milestone_link(event, args['milestone'])),
+    Event.UNSET_MILESTONE: lambda event, args:
+        format_html('removed from the {} milestone the issue',
+                    _milestone_link(event, args['milestone'])),
+    Event.CHANGE_MILESTONE: lambda event, args:
+        format_html('moved from the {} milestone to the {} milestone '
+                    'the issue',
+                    _milestone_link(event, args['old_milestone']),
+                    _milestone_link(event, args['new_milestone'])),
+    Event.REFERENCE: lambda event, args: "referenced the issue",
+    Event.SET_DUE_DATE: lambda event, args:
+        format_html('set the due date to <em>{}</em> of issue',
+                    _due_date(args, 'due_date')),
+    Event.CHANGE_DUE_DATE: lambda event, args:
+        format_html('changed the due date from <em>{}</em> to <em>{}</em> '
+                    'of issue', _due_date(args, 'old_due_date'),
+                    _due_date(args, 'new_due_date')),
+    Event.UNSET_DUE_DATE: lambda event, args: 'removed the due date of issue',
+}
+
+# Event code -> formatter of the event in the issue timeline
+_DESCRIPTIONS = {
+    Event.DESCRIBE: lambda event, args: "commented",
+    Event.COMMENT: lambda event, args: "commented",
+    Event.CLOSE: lambda event, args: "closed this issue",
+    Event.REOPEN: lambda event, args: "reopened this issue",
+    Event.RENAME: lambda event, args:
+        format_html("changed the title from <mark>{}</mark> to <mark>{}</mark>",
+                    args['old_title'], args['new_title']),
+    Event.ADD_LABEL: lambda event, args:
+        format_html('added the {} label', _label_link(event)),
+    Event.DEL_LABEL: lambda event, args:
+        format_html('removed the {} label', _label_link(event)),
+    Event.SET_MILESTONE: lambda event, args:
+        format_html('added this to the {} milestone',
+                    _milestone_link(event, args['milestone'])),
+    Event.UNSET_MILESTONE: lambda event, args:
+        format_html('removed this to the {} milestone',
+                    _milestone_link(event, args['milestone'])),
+    Event.CHANGE_MILESTONE: lambda event, args:
+        format_html('moved this from the {} milestone to the {} milestone',
+                    _milestone_link(event, args['old_milestone']),
+                    _milestone_link(event, args['new_milestone'])),
+    Event.REFERENCE: lambda event, args: "referenced this issue",
+    Event.SET_DUE_DATE: lambda event, args:
+        format_html('set the due date to <em>{}</em>',
+                    _due_date(args, 'due_date')),
+    Event.CHANGE_DUE_DATE: lambda event, args:
+        format_html('changed the due date from <em>{}</em> to <em>{}</em>',
+                    _due_date(args, 'old_due_date'),
+                    _due_date(args, 'new_due_date')),
+    Event.UNSET_DUE_DATE: lambda event, args: 'removed the due date',
+}
@@ -1,8 +1,22 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.sites.models import Site
 
-from tracker.models import Settings, Project, Label
+from tracker.models import Settings, Project, Label, Event
+from tracker.models import refresh_unread_counters
+
+
+@receiver(connection_created, dispatch_uid="SQLite pragmas.")
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', [])
+    if pragmas:
+        script = ''.join('PRAGMA %s;' % pragma for pragma in pragmas)
+        with connection.cursor() as cursor:
+            cursor.executescript(script)
 
 
 def create_default_settings(sender, **kwargs):
@@ -10,6 +24,7 @@ def create_default_settings(sender, **kwargs):
         if not hasattr(site, 'settings'):
             Settings(site=site).save()
 
+
 @receiver(post_save, sender=Project, dispatch_uid="Default project labels.")
 def create_default_project_labels(sender, instance, created, **kwargs):
     if not created:
@@ -18,3 +33,10 @@ def create_default_project_labels(sender, instance, created, **kwargs):
         Label(project=instance, name='bug', color='#FF0000').save()
         Label(project=instance, name='feature', color='#00A000').save()
         Label(project=instance, name='documentation', color='#1D3DBE').save()
+
+
+@receiver(post_save, sender=Event,
+          dispatch_uid="Unread counters on new event.")
+def update_unread_counters(sender, instance, created, **kwargs):
+    if created:
+        refresh_unread_counters(instance.issue_id)
@@ -3,8 +3,10 @@ from celery import shared_task
 from django.core import mail
 from django.core.mail import EmailMultiAlternatives
 
+from tracker.models import ReadState
 
-@shared_task
+
+@shared_task(ignore_result=True)
 def send_mails(mails):
     messages = []
     for subject, message, from_email, dests, reply_to, headers in mails:
@@ -14,3 +16,11 @@ def send_mails(mails):
         messages += [msg]
     with mail.get_connection() as connection:
         connection.send_messages(messages)
+
+
+@shared_task(ignore_result=True)
+def refresh_unread(issue_pk=None):
+    readstates = ReadState.objects.all()
+    if issue_pk is not None:
+        readstates = readstates.filter(issue__pk=issue_pk)
+    readstates.refresh_unread()
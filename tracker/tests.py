@@ -59,6 +59,33 @@ class TestViews(TestCase):
         response = self.client.get(reverse('list-project'))
         self.assertEqual(response.status_code, 200)
 
+    def test_project_unread_issues(self):
+        user = User.objects.get(username='admin')
+        project = Project.objects.get(name='project-1')
+        self.assertEqual(project.get_unread_issues_nb(user), 2)
+        response = self.client.get(reverse('list-project'))
+        self.assertEqual(response.context['read_state_projects'][project], 2)
+        issue = project.issues.get(title='Issue 1')
+        self.assertTrue(issue.have_unread_message(user))
+        issue.mark_as_read(user)
+        self.assertFalse(issue.have_unread_message(user))
+        self.assertEqual(project.get_unread_issues_nb(user), 1)
+        response = self.client.get(reverse('list-project'))
+        self.assertEqual(response.context['read_state_projects'][project], 1)
+        self.assertEqual(issue.get_unread_event_nb(user), 0)
+        event = Event(issue=issue, author=user, code=Event.COMMENT)
+        event.save()
+        self.assertTrue(issue.have_unread_message(user))
+        self.assertEqual(issue.get_unread_event_nb(user), 1)
+        self.assertEqual(project.get_unread_issues_nb(user), 2)
+        response = self.client.get(reverse('list-issue', args=[project.name]))
+        self.assertEqual(response.context['read_state_issues'][issue], 1)
+        other = project.issues.get(title='THE Issue 2')
+        self.assertEqual(response.context['read_state_issues'][other], other.events.count())
+        self.client.post(reverse('delete-comment', args=[project.name, issue.id, event.id]))
+        self.assertEqual(issue.get_unread_event_nb(user), 0)
+        self.assertEqual(project.get_unread_issues_nb(user), 1)
+
     def test_project_add(self):
         count = Project.objects.count()
         response = self.client.get(reverse('add-project'))
@@ -208,6 +235,7 @@ class TestViews(TestCase):
             'description': 'New issue.',
         })
         issue = Issue.objects.get(title='new issue')
+        self.assertEqual(issue.id, 3)
         self.assertRedirects(response, reverse('show-issue', args=[project.name, issue.id]))
         self.assertEqual(Issue.objects.count(), count + 1)
         response = self.client.post(reverse('add-issue', args=[project.name]), {
@@ -254,6 +282,10 @@ class TestViews(TestCase):
         issue = project.issues.get(title='THE Issue 2')
         response = self.client.get(reverse('show-issue', args=[project.name, issue.id]))
         self.assertEqual(response.status_code, 200)
+        Event(issue=issue, author=issue.author, code=Event.RENAME,
+                args={'old_title': 'THE Issue 2', 'new_title': '<b>Issue 2</b>'}).save()
+        response = self.client.get(reverse('show-issue', args=[project.name, issue.id]))
+        self.assertContains(response, '<mark>&lt;b&gt;Issue 2&lt;/b&gt;</mark>')
 
     def test_issue_comment_add(self):
         project = Project.objects.get(name='project-1')
@@ -323,6 +355,17 @@ class TestViews(TestCase):
         self.assertRedirects(response, reverse('show-issue', args=[project.name, issue.id]))
         self.assertContains(response, 'not modified')
 
+    def test_issue_timeline_later_comment(self):
+        project = Project.objects.get(name='project-1')
+        issue = project.issues.get(title='Issue 1')
+        user = User.objects.get(username='admin')
+        Event(issue=issue, author=user, code=Event.COMMENT).save()
+        events = list(issue.events.with_later_comment().order_by('pk'))
+        self.assertEqual([e.has_later_comment for e in events], [True, False])
+        Event(issue=issue, author=user, code=Event.CLOSE).save()
+        events = list(issue.events.with_later_comment().order_by('pk'))
+        self.assertEqual([e.has_later_comment for e in events], [True, False, False])
+
     def test_issue_comment_delete(self):
         project = Project.objects.get(name='project-1')
         issue = project.issues.get(title='THE Issue 2')
@@ -377,6 +420,11 @@ class TestViews(TestCase):
         issue = Issue.objects.get(pk=issue.pk)
         self.assertFalse(label in issue.labels.all())
         self.assertEqual(issue.events.count(), count + 2)
+        labels = list(project.labels.filter(name__in=['bug', 'documentation']))
+        issue.add_label(issue.author, labels[0])
+        issue.add_labels(issue.author, labels)
+        self.assertEqual(set(issue.labels.all()), set(labels))
+        self.assertEqual(issue.events.filter(code=Event.ADD_LABEL).count(), 3)
 
     def test_issue_add_remove_milestone(self):
         project = Project.objects.get(name='project-1')
@@ -493,12 +541,27 @@ class TestViews(TestCase):
         project = Project.objects.get(name='project-1')
         response = self.client.get(reverse('list-milestone', args=[project.name]))
         self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '0% complete', count=2)
+        milestone = project.milestones.get(name='v2.0')
+        Issue.objects.create(project=project, id=3, title='Issue 3',
+                author=User.objects.get(username='admin'),
+                milestone=milestone, closed=True)
+        self.assertEqual(milestone.progress(), 50)
+        self.assertEqual(project.milestones.with_progress().get(pk=milestone.pk).progress(), 50)
+        response = self.client.get(reverse('list-milestone', args=[project.name]))
+        self.assertContains(response, '50% complete')
 
     def test_milestone_add(self):
         project = Project.objects.get(name='project-1')
         count = project.milestones.count()
         response = self.client.get(reverse('add-milestone', args=[project.name]))
         self.assertEqual(response.status_code, 200)
+        response = self.client.post(reverse('add-milestone', args=[project.name]), {
+            'name': 'New version', # invalid name
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Please enter only lowercase')
+        self.assertFalse(Milestone.name_validator.regex.match('new-version\n'))
         response = self.client.post(reverse('add-milestone', args=[project.name]), {
             'name': 'new-version',
         })
@@ -548,3 +611,23 @@ class TestViews(TestCase):
         self.assertEqual(Milestone.objects.filter(project=project, deleted=False).count(), count_active - 1)
         self.assertEqual(Milestone.objects.filter(project=project, deleted=True).count(), count_deleted + 1)
         self.assertEqual(project.milestones.count(), count_active - 1)
+
+    # Activity
+
+    def test_activity(self):
+        project = Project.objects.get(name='project-1')
+        response = self.client.get(reverse('show-activity', args=[project.name]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'label:bug')
+        self.assertContains(response, 'milestone:v2.0')
+        label = Label.objects.create(project=project, name='<i>label</i>')
+        issue = project.issues.first()
+        issue.add_label(User.objects.get(username='admin'), label)
+        response = self.client.get(reverse('show-activity', args=[project.name]))
+        self.assertContains(response, '&lt;i&gt;label&lt;/i&gt;')
+        self.assertNotContains(response, '<i>label</i>')
+        events = list(Event.objects.filter(issue__project=project).for_timeline())
+        with self.assertNumQueries(0):
+            for event in events:
+                event.activity()
+                str(event)
@@ -1,9 +1,9 @@
 from __future__ import unicode_literals
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Max, Count, F, Q, OuterRef, Subquery, Exists
+from django.db.models import Max, Count, Q
 
-from tracker.models import Label, Milestone, ReadState, Event
+from tracker.models import Label, Milestone
 from accounts.models import User
 
 import shlex
@@ -189,11 +189,7 @@ class IssueManager:
             issues = issues.filter(filter)
 
         if self.unread:
-            datelastread = ReadState.objects.filter(issue=OuterRef('pk'),user=self.user)
-            datelastupdate = Event.objects.filter(issue=OuterRef('pk')).order_by('-date')
-            issues = issues.annotate(datelastupdate=Subquery(datelastupdate.values('date')[:1]), \
-                                     datelastread=Subquery(datelastread.values('lastread'))) \
-                           .filter(Q(datelastread__isnull=True) | Q(datelastread__lt=F('datelastupdate')))
+            issues = issues.unread_by(self.user)
 
         if self.sort == 'newest':
             issues = issues.order_by('-opened_at')
@@ -8,12 +8,14 @@ from django.conf import settings
 from django.urls import reverse
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.http import HttpResponse, Http404
+from django.db import transaction
 from django.db.models import Max, Count
 
 from tracker.utils import markdown_to_html, IssueManager
 from tracker.utils.issue_manager import STATUS_VALUES, SORT_VALUES
 from tracker.forms import *
 from tracker.models import *
+from tracker.models import refresh_unread_counters
 from tracker.notifications import *
 from accounts.models import User
 from permissions.models import ProjectPermission
@@ -86,8 +88,8 @@ def project_list(request, archived=False):
 
 
     read_state_projects = {}
-    for project in request.projects.all():
-        read_state_projects[project] = project.get_unread_issues_nb(request.user)
+    for project in request.projects.with_unread_issues_nb(request.user):
+        read_state_projects[project] = project.unread_issues_nb
     c = {
         'archived': archived,
         'read_state_projects': read_state_projects,
@@ -263,10 +265,10 @@ def issue_list(request, project):
     if issuemanager.error:
         messages.error(request, issuemanager.error)
 
-    if issues:
+    if issues.exists():
         page = request.GET.get('page')
-        paginator = Paginator(issues,
-                get_current_site(request).settings.items_per_page)
+        paginator = Paginator(issues.with_display(),
+                request.site_settings.items_per_page)
         try:
             issues = paginator.page(page)
         except PageNotAnInteger:
@@ -277,8 +279,8 @@ def issue_list(request, project):
         paginator = None
 
     read_state_issues = {}
-    for issue in project.issues.all():
-        read_state_issues[issue] = issue.get_unread_event_nb(request.user)
+    for issue in project.issues.with_unread_event_nb(request.user):
+        read_state_issues[issue] = issue.unread_event_nb
 
     c = {
         'project': project,
@@ -300,9 +302,10 @@ def issue_edit(request, project, issue=None):
 
     if issue:
         issue = get_object_or_404(Issue, project=project, id=issue)
-        if issue.getdescevent() and not issue.getdescevent().editable_by(request):
+        desc = issue.getdescevent()
+        if desc is not None and not desc.editable_by(request):
             raise PermissionDenied()
-        elif (not issue.getdescevent()) and (not request.user.has_perm('modify_issue', project)):
+        elif desc is None and not request.user.has_perm('modify_issue', project):
             raise PermissionDenied()
         init_data = {'title': issue.title,
                      'due_date': issue.due_date,
@@ -369,9 +372,13 @@ def issue_edit(request, project, issue=None):
 
         else:
 
-            issue = Issue(title=title, due_date=due_date, author=request.user,
-                    project=project, id=Issue.next_id(project))
-            issue.save()
+            with transaction.atomic():
+                # lock the project so concurrent creations get distinct ids
+                Project.objects.select_for_update().get(pk=project.pk)
+                issue = Issue(title=title, due_date=due_date,
+                        author=request.user, project=project,
+                        id=Issue.next_id(project))
+                issue.save()
             issue.subscribers.add(request.user)
             issue.description = description
             notify_new_issue(issue)
@@ -390,7 +397,8 @@ def issue_edit(request, project, issue=None):
 
 def issue_details(request, project, issue):
 
-    issue = get_object_or_404(Issue, project=project, id=issue)
+    issue = get_object_or_404(Issue.objects.with_display(),
+            project=project, id=issue)
 
     labels = Label.objects.filter(project=project, deleted=False) \
         .exclude(id__in=issue.labels.all().values_list('id'))
@@ -398,7 +406,7 @@ def issue_details(request, project, issue):
     if issue.milestone:
         milestones = milestones.exclude(name=issue.milestone.name)
 
-    events = issue.events.all()
+    events = issue.events.for_timeline().with_later_comment()
 
     if request.user.has_perm('create_comment', project):
         form = CommentForm(request.POST or None)
@@ -506,6 +514,7 @@ def issue_comment_delete(request, project, issue, comment):
             issue__project=project, issue__id=issue, id=comment)
 
     comment.delete()
+    refresh_unread_counters(comment.issue_id)
     messages.success(request, 'Comment deleted successfully.')
 
     return redirect('show-issue', project.name, issue)
@@ -746,6 +755,9 @@ def milestone_list(request, project):
         messages.error(request, 'There is an error in your filter.')
         milestones = None
 
+    if milestones is not None:
+        milestones = milestones.with_progress()
+
     return render(request, 'tracker/milestone_list.html', {
         'project': project,
         'milestones': milestones,
@@ -863,12 +875,13 @@ def milestone_delete(request, project, name):
 
 def activity(request, project):
 
-    events = Event.objects.filter(issue__project=project).order_by('-pk')
+    events = Event.objects.filter(issue__project=project).for_timeline() \
+            .order_by('-pk')
 
-    if events:
+    if events.exists():
         page = request.GET.get('page')
         paginator = Paginator(events,
-                get_current_site(request).settings.items_per_page)
+                request.site_settings.items_per_page)
         try:
             events = paginator.page(page)
         except PageNotAnInteger: